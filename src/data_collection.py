@@ -14,19 +14,33 @@ Output Files:
 - data/raw/players.csv: Player information and season stats
 - data/raw/fixtures.csv: Match fixtures with difficulty ratings
 - data/raw/results.csv: Historical gameweek performance data
+
+Raw API responses are cached in data/raw/.cache/ so repeat runs only re-fetch
+data that can still change. Run with --refresh to clear the cache first.
 """
 
+import argparse
 import json
 import os
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    from .schema import (FIXTURES_DTYPES, PLAYER_DECIMAL_COLUMNS, PLAYERS_DTYPES,
+                         RESULTS_DTYPES, TEAMS_DTYPES)
+except ImportError:  # Run as a script from src/
+    from schema import (FIXTURES_DTYPES, PLAYER_DECIMAL_COLUMNS, PLAYERS_DTYPES,
+                        RESULTS_DTYPES, TEAMS_DTYPES)
+
 
 class FPLDataCollector:
     """Collects data from the FPL API and saves to CSV files."""
@@ -35,116 +49,187 @@ class FPLDataCollector:
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
+    MAX_WORKERS = 8  # Concurrent gameweek requests
+    CACHE_TTL = 600  # Seconds to reuse cached bootstrap/fixtures responses
+    
+    # API fields kept from bootstrap-static elements, in output column order
+    PLAYER_FIELDS = [
+        'id', 'web_name', 'first_name', 'second_name', 'team',
+        'element_type',  # Position (1=GK, 2=DEF, 3=MID, 4=FWD)
+        'now_cost',  # Price in 0.1m units
+        'total_points', 'minutes', 'goals_scored', 'assists', 'clean_sheets',
+        'goals_conceded', 'own_goals', 'penalties_saved', 'penalties_missed',
+        'yellow_cards', 'red_cards', 'saves', 'bonus',
+        'bps',  # Bonus points system
+        'influence', 'creativity', 'threat', 'ict_index', 'selected_by_percent',
+        'form', 'points_per_game', 'ep_next', 'ep_this', 'value_form', 'value_season',
+        'transfers_in', 'transfers_out', 'transfers_in_event', 'transfers_out_event',
+        'news', 'news_added', 'chance_of_playing_this_round',
+        'chance_of_playing_next_round',
+        'status'  # a=available, d=doubtful, i=injured, u=unavailable
+    ]
+    TEAM_FIELDS = [
+        'id', 'name', 'short_name', 'strength',
+        'strength_overall_home', 'strength_overall_away',
+        'strength_attack_home', 'strength_attack_away',
+        'strength_defence_home', 'strength_defence_away'
+    ]
+    FIXTURE_FIELDS = [
+        'id', 'event',
+        'team_h',  # Home team ID
+        'team_a',  # Away team ID
+        'team_h_difficulty', 'team_a_difficulty', 'kickoff_time',
+        'finished', 'started', 'team_h_score', 'team_a_score', 'minutes',
+        'provisional_start_time', 'pulse_id'
+    ]
+    RESULT_STAT_FIELDS = [
+        'minutes', 'goals_scored', 'assists', 'clean_sheets', 'goals_conceded',
+        'own_goals', 'penalties_saved', 'penalties_missed', 'yellow_cards',
+        'red_cards', 'saves', 'bonus', 'bps', 'influence', 'creativity', 'threat',
+        'ict_index', 'total_points', 'in_dreamteam'
+    ]
     
     def __init__(self, output_dir: str = "data/raw"):
         """Initialize the data collector."""
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Raw API responses are cached on disk between runs
+        self.cache_dir = self.output_dir / ".cache"
+        self.cache_dir.mkdir(exist_ok=True)
+        
+        # Gameweeks whose live data can no longer change (set from bootstrap)
+        self.checked_gameweeks = set()
+        
+        # Endpoints the API confirmed unchanged (HTTP 304) during this run
+        self.unchanged_endpoints = set()
+        
+        # Gameweeks whose live data could not be fetched during this run
+        self.failed_gameweeks = set()
+        
         # Setup session with retry strategy
         self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
             status_forcelist=[429, 500, 502, 503, 504],
-            backoff_factor=1
+            backoff_factor=1,
+            respect_retry_after_header=True  # Back off politely when rate limited
+        )
+        # Keep one pooled keep-alive connection per concurrent request; blocking
+        # on a full pool reuses connections instead of opening throwaway ones
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=1,
+            pool_maxsize=self.MAX_WORKERS + 1,  # Gameweek workers plus fixtures thread
+            pool_block=True
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         self.session.headers.update(self.HEADERS)
         
-    def fetch_json(self, endpoint: str) -> Dict:
-        """Fetch JSON data from FPL API endpoint with error handling."""
+    def fetch_json(self, endpoint: str, max_age: Optional[float] = None) -> Dict:
+        """Fetch JSON data from FPL API endpoint with error handling.
+        
+        If max_age is given, a cached response younger than max_age seconds is
+        returned without hitting the API, and fresh responses are cached. Older
+        cached responses are revalidated with their ETag where one was sent.
+        """
+        cache_file = self.cache_dir / f"{endpoint.strip('/').replace('/', '_')}.json"
+        etag_file = cache_file.with_suffix('.etag')
+        headers = {}
+        if max_age is not None and cache_file.exists():
+            if time.time() - cache_file.stat().st_mtime <= max_age:
+                return json.loads(cache_file.read_bytes())
+            if etag_file.exists():
+                headers['If-None-Match'] = etag_file.read_text()
+        
         url = f"{self.BASE_URL}/{endpoint}"
         print(f"Fetching: {url}")
         
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.session.get(url, headers=headers, timeout=30)
+            if response.status_code == 304:
+                # Unchanged on the server: restart the cache window and reuse it
+                cache_file.touch()
+                self.unchanged_endpoints.add(endpoint)
+                return json.loads(cache_file.read_bytes())
             response.raise_for_status()
-            return response.json()
+            # Parse the raw bytes; avoids building an intermediate str of the body
+            try:
+                data = json.loads(response.content)
+            except ValueError as e:
+                raise requests.exceptions.InvalidJSONError(e, response=response) from e
         except requests.exceptions.RequestException as e:
             print(f"Error fetching {url}: {e}")
             raise
             
+        if max_age is not None:
+            # Write then rename so an interrupted run never leaves a partial file
+            tmp_file = cache_file.with_suffix('.tmp')
+            tmp_file.write_bytes(json.dumps(data, separators=(',', ':')).encode())
+            os.replace(tmp_file, cache_file)
+            
+            etag = response.headers.get('ETag')
+            if etag:
+                etag_file.write_text(etag)
+            else:
+                etag_file.unlink(missing_ok=True)
+            
+        return data
+        
+    def clear_cache(self) -> None:
+        """Delete all cached API responses so the next fetches hit the API."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.cache_dir.mkdir(exist_ok=True)
+        
+    def outputs_up_to_date(self) -> bool:
+        """Check saved CSVs exist and were written after the cached bootstrap last changed."""
+        etag_file = self.cache_dir / "bootstrap-static.etag"
+        if not etag_file.exists():
+            return False
+            
+        changed_at = etag_file.stat().st_mtime
+        for name in ("players.csv", "fixtures.csv", "results.csv"):
+            output_file = self.output_dir / name
+            if not output_file.exists() or output_file.stat().st_mtime < changed_at:
+                return False
+        return True
+            
     def collect_bootstrap_data(self) -> tuple[pd.DataFrame, pd.DataFrame]:
         """Collect player and team data from bootstrap-static endpoint."""
         print("📊 Collecting bootstrap data (players, teams, positions)...")
         
-        data = self.fetch_json("bootstrap-static/")
-        
-        # Extract players data
-        players_data = []
-        for player in data['elements']:
-            # Flatten nested data and convert to snake_case
-            player_record = {
-                'player_id': player['id'],
-                'web_name': player['web_name'],
-                'first_name': player['first_name'], 
-                'second_name': player['second_name'],
-                'team_id': player['team'],
-                'element_type': player['element_type'],  # Position (1=GK, 2=DEF, 3=MID, 4=FWD)
-                'now_cost': player['now_cost'],  # Price in 0.1m units
-                'total_points': player['total_points'],
-                'minutes': player['minutes'],
-                'goals_scored': player['goals_scored'],
-                'assists': player['assists'],
-                'clean_sheets': player['clean_sheets'],
-                'goals_conceded': player['goals_conceded'],
-                'own_goals': player['own_goals'],
-                'penalties_saved': player['penalties_saved'],
-                'penalties_missed': player['penalties_missed'],
-                'yellow_cards': player['yellow_cards'],
-                'red_cards': player['red_cards'],
-                'saves': player['saves'],
-                'bonus': player['bonus'],
-                'bps': player['bps'],  # Bonus points system
-                'influence': float(player['influence']) if player['influence'] else 0,
-                'creativity': float(player['creativity']) if player['creativity'] else 0,
-                'threat': float(player['threat']) if player['threat'] else 0,
-                'ict_index': float(player['ict_index']) if player['ict_index'] else 0,
-                'selected_by_percent': float(player['selected_by_percent']) if player['selected_by_percent'] else 0,
-                'form': float(player['form']) if player['form'] else 0,
-                'points_per_game': float(player['points_per_game']) if player['points_per_game'] else 0,
-                'ep_next': float(player['ep_next']) if player['ep_next'] else 0,
-                'ep_this': float(player['ep_this']) if player['ep_this'] else 0,
-                'value_form': float(player['value_form']) if player['value_form'] else 0,
-                'value_season': float(player['value_season']) if player['value_season'] else 0,
-                'transfers_in': player['transfers_in'],
-                'transfers_out': player['transfers_out'],
-                'transfers_in_event': player['transfers_in_event'],
-                'transfers_out_event': player['transfers_out_event'],
-                'news': player['news'],
-                'news_added': player['news_added'],
-                'chance_of_playing_this_round': player['chance_of_playing_this_round'],
-                'chance_of_playing_next_round': player['chance_of_playing_next_round'],
-                'status': player['status']  # a=available, d=doubtful, i=injured, u=unavailable
-            }
-            players_data.append(player_record)
-            
-        players_df = pd.DataFrame(players_data)
+        data = self.fetch_json("bootstrap-static/", max_age=self.CACHE_TTL)
+        
+        # FPL corrects points and bonus after a gameweek finishes; live data is
+        # only final, and safe to cache forever, once the event is data_checked
+        self.checked_gameweeks = {
+            event['id'] for event in data.get('events', []) if event.get('data_checked')
+        }
+        
+        # Build frames straight from the API records, renaming IDs to snake_case
+        players_df = pd.DataFrame(data['elements'], columns=self.PLAYER_FIELDS)
+        players_df = players_df.rename(columns={'id': 'player_id', 'team': 'team_id'})
+        
+        # Decimal stats arrive as strings ("" when unset)
+        players_df[PLAYER_DECIMAL_COLUMNS] = (
+            players_df[PLAYER_DECIMAL_COLUMNS]
+            .apply(pd.to_numeric, errors='coerce')
+            .fillna(0)
+        )
+        players_df = players_df.astype(PLAYERS_DTYPES)
         
         # Extract teams data for reference
-        teams_data = []
-        for team in data['teams']:
-            team_record = {
-                'team_id': team['id'],
-                'team_name': team['name'],
-                'short_name': team['short_name'],
-                'strength': team['strength'],
-                'strength_overall_home': team['strength_overall_home'],
-                'strength_overall_away': team['strength_overall_away'], 
-                'strength_attack_home': team['strength_attack_home'],
-                'strength_attack_away': team['strength_attack_away'],
-                'strength_defence_home': team['strength_defence_home'],
-                'strength_defence_away': team['strength_defence_away']
-            }
-            teams_data.append(team_record)
-            
-        teams_df = pd.DataFrame(teams_data)
+        teams_df = pd.DataFrame(data['teams'], columns=self.TEAM_FIELDS)
+        teams_df = teams_df.rename(columns={'id': 'team_id', 'name': 'team_name'})
+        teams_df = teams_df.astype(TEAMS_DTYPES)
         
-        # Add position names
-        position_map = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
-        players_df['position'] = players_df['element_type'].map(position_map)
+        # Add position names (element_type 1-4 indexes the categories directly)
+        element_type = players_df['element_type'].to_numpy()
+        codes = np.where((element_type >= 1) & (element_type <= 4), element_type - 1, -1)
+        players_df['position'] = pd.Categorical.from_codes(
+            codes.astype(np.int8), categories=['GK', 'DEF', 'MID', 'FWD']
+        )
         
         # Add team names
         players_df = players_df.merge(
@@ -160,31 +245,14 @@ class FPLDataCollector:
         """Collect fixture data with difficulty ratings."""
         print("🏟️ Collecting fixtures data...")
         
-        data = self.fetch_json("fixtures/")
-        
-        fixtures_data = []
-        for fixture in data:
-            # Only include fixtures that have been scheduled
-            if fixture['event'] is not None:
-                fixture_record = {
-                    'fixture_id': fixture['id'],
-                    'gameweek': fixture['event'],
-                    'team_h': fixture['team_h'],  # Home team ID
-                    'team_a': fixture['team_a'],  # Away team ID  
-                    'team_h_difficulty': fixture['team_h_difficulty'],
-                    'team_a_difficulty': fixture['team_a_difficulty'],
-                    'kickoff_time': fixture['kickoff_time'],
-                    'finished': fixture['finished'],
-                    'started': fixture['started'],
-                    'team_h_score': fixture['team_h_score'],
-                    'team_a_score': fixture['team_a_score'],
-                    'minutes': fixture['minutes'],
-                    'provisional_start_time': fixture['provisional_start_time'],
-                    'pulse_id': fixture['pulse_id']
-                }
-                fixtures_data.append(fixture_record)
-                
-        fixtures_df = pd.DataFrame(fixtures_data)
+        data = self.fetch_json("fixtures/", max_age=self.CACHE_TTL)
+        
+        fixtures_df = pd.DataFrame(data, columns=self.FIXTURE_FIELDS)
+        fixtures_df = fixtures_df.rename(columns={'id': 'fixture_id', 'event': 'gameweek'})
+        
+        # Only include fixtures that have been scheduled
+        fixtures_df = fixtures_df[fixtures_df['gameweek'].notna()].reset_index(drop=True)
+        fixtures_df = fixtures_df.astype(FIXTURES_DTYPES)
         
         # Convert kickoff_time to datetime
         fixtures_df['kickoff_time'] = pd.to_datetime(fixtures_df['kickoff_time'])
@@ -196,57 +264,52 @@ class FPLDataCollector:
         """Collect historical gameweek performance data."""
         print(f"📈 Collecting gameweek data (up to GW{max_gameweeks})...")
         
-        all_results = []
-        
-        for gw in range(1, max_gameweeks + 1):
-            print(f"  Fetching GW{gw}...", end=" ")
-            
+        def fetch_gameweek(gw: int) -> Optional[Dict]:
             try:
-                # Get live data for this gameweek
-                live_data = self.fetch_json(f"event/{gw}/live/")
-                
-                # Extract player performance data
-                for player_data in live_data['elements']:
-                    stats = player_data.get('stats', {})
-                    
-                    result_record = {
-                        'player_id': player_data.get('id'),
-                        'gameweek': gw,
-                        'minutes': stats.get('minutes', 0),
-                        'goals_scored': stats.get('goals_scored', 0),
-                        'assists': stats.get('assists', 0), 
-                        'clean_sheets': stats.get('clean_sheets', 0),
-                        'goals_conceded': stats.get('goals_conceded', 0),
-                        'own_goals': stats.get('own_goals', 0),
-                        'penalties_saved': stats.get('penalties_saved', 0),
-                        'penalties_missed': stats.get('penalties_missed', 0),
-                        'yellow_cards': stats.get('yellow_cards', 0),
-                        'red_cards': stats.get('red_cards', 0),
-                        'saves': stats.get('saves', 0),
-                        'bonus': stats.get('bonus', 0),
-                        'bps': stats.get('bps', 0),
-                        'influence': float(stats.get('influence', 0)),
-                        'creativity': float(stats.get('creativity', 0)), 
-                        'threat': float(stats.get('threat', 0)),
-                        'ict_index': float(stats.get('ict_index', 0)),
-                        'total_points': stats.get('total_points', 0),
-                        'in_dreamteam': stats.get('in_dreamteam', False)
-                    }
-                    all_results.append(result_record)
-                    
-                print("✓")
-                time.sleep(0.5)  # Rate limiting
-                
+                max_age = float('inf') if gw in self.checked_gameweeks else None
+                return self.fetch_json(f"event/{gw}/live/", max_age=max_age)
             except requests.exceptions.RequestException as e:
-                print(f"✗ (Error: {e})")
+                print(f"  GW{gw} ✗ (Error: {e})")
                 # Continue with next gameweek if one fails
+                return None
+        
+        # Fetch gameweeks concurrently; map() keeps results in gameweek order
+        gameweeks = range(1, max_gameweeks + 1)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            live_payloads = list(executor.map(fetch_gameweek, gameweeks))
+        
+        per_gameweek = []
+        
+        for gw, live_data in zip(gameweeks, live_payloads):
+            if live_data is None:
+                self.failed_gameweeks.add(gw)
                 continue
                 
-        results_df = pd.DataFrame(all_results)
+            # Build one frame per gameweek straight from the stats records
+            elements = live_data['elements']
+            if elements:
+                gw_df = pd.DataFrame(
+                    [player_data.get('stats', {}) for player_data in elements],
+                    columns=self.RESULT_STAT_FIELDS
+                )
+                gw_df.insert(0, 'player_id', [player_data.get('id') for player_data in elements])
+                gw_df.insert(1, 'gameweek', gw)
+                per_gameweek.append(gw_df)
+                
+            print(f"  GW{gw} ✓")
+                
+        results_df = pd.concat(per_gameweek, ignore_index=True) if per_gameweek else pd.DataFrame()
         
         if len(results_df) > 0:
-            # Sort by gameweek and player_id
-            results_df = results_df.sort_values(['gameweek', 'player_id']).reset_index(drop=True)
+            # Stats missing from a record default to zero
+            results_df = results_df.fillna({'in_dreamteam': False}).fillna(0)
+            results_df = results_df.astype(RESULTS_DTYPES)
+            
+            # Sort by gameweek and player_id. Rows already arrive grouped by
+            # gameweek, so a stable sort on one combined integer key is near linear
+            player_ids = results_df['player_id'].to_numpy(dtype=np.int64)
+            sort_key = results_df['gameweek'].to_numpy(dtype=np.int64) * (player_ids.max() + 1) + player_ids
+            results_df = results_df.iloc[np.argsort(sort_key, kind='stable')].reset_index(drop=True)
             
         print(f"✅ Collected {len(results_df)} player-gameweek records")
         return results_df
@@ -280,16 +343,32 @@ class FPLDataCollector:
             # Collect bootstrap data (players, teams)
             players_df, teams_df = self.collect_bootstrap_data()
             
-            # Collect fixtures data
-            fixtures_df = self.collect_fixtures_data()
+            # Nothing has changed if the API says so and the saved files are newer
+            if "bootstrap-static/" in self.unchanged_endpoints and self.outputs_up_to_date():
+                print("✅ FPL data unchanged since last run, keeping existing files")
+                return
             
-            # Collect historical gameweek data
-            # Note: This will only collect data for completed gameweeks
-            results_df = self.collect_gameweek_data()
+            # Fixtures don't depend on gameweek data, so fetch them alongside
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                fixtures_future = executor.submit(self.collect_fixtures_data)
+                
+                # Collect historical gameweek data
+                # Note: This will only collect data for completed gameweeks
+                results_df = self.collect_gameweek_data()
+                
+                # Collect fixtures data
+                fixtures_df = fixtures_future.result()
             
             # Save all data
             self.save_dataframes(players_df, fixtures_df, results_df)
             
+            # Results are incomplete, so the next run must not skip collection
+            # on an unchanged bootstrap
+            if self.failed_gameweeks:
+                (self.cache_dir / "bootstrap-static.etag").unlink(missing_ok=True)
+                missing = ", ".join(f"GW{gw}" for gw in sorted(self.failed_gameweeks))
+                print(f"⚠️ Missing {missing}; these will be refetched on the next run")
+            
             print("=" * 50)
             print("🎉 Data collection completed successfully!")
             print(f"📁 Files saved to: {self.output_dir}")
@@ -301,7 +380,16 @@ class FPLDataCollector:
 
 def main():
     """Main entry point for data collection."""
+    parser = argparse.ArgumentParser(description="Fetch FPL API data into data/raw/")
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help="Clear cached API responses in data/raw/.cache/ and refetch everything"
+    )
+    args = parser.parse_args()
+    
     collector = FPLDataCollector()
+    if args.refresh:
+        collector.clear_cache()
     collector.collect_all_data()
 
 
@@ -6,11 +6,26 @@ This module validates the collected FPL data to ensure it meets quality standard
 before proceeding to feature engineering.
 """
 
+import argparse
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, FrozenSet, List
 
+import numpy as np
 import pandas as pd
 
+try:
+    from .schema import FIXTURES_REQUIRED, PLAYERS_REQUIRED, RESULTS_REQUIRED
+except ImportError:  # Run as a script from src/
+    from schema import FIXTURES_REQUIRED, PLAYERS_REQUIRED, RESULTS_REQUIRED
+
+
+def all_between(values: np.ndarray, low: float, high: float) -> bool:
+    """Check all values lie in [low, high] with two reductions and no temporaries."""
+    if values.size == 0:
+        return True
+    # NaN propagates through min/max and fails the comparison
+    return bool(values.min() >= low and values.max() <= high)
+
 
 class FPLDataValidator:
     """Validates FPL data quality and structure."""
@@ -19,21 +34,23 @@ class FPLDataValidator:
         """Initialize the validator."""
         self.data_dir = Path(data_dir)
         
+    def read_columns(self, path: Path, columns: FrozenSet[str]) -> pd.DataFrame:
+        """Read only the given columns from a CSV, ignoring any that are absent."""
+        return pd.read_csv(path, usecols=lambda col: col in columns)
+        
     def validate_players_data(self, df: pd.DataFrame) -> Dict[str, bool]:
         """Validate players dataset."""
         checks = {}
         
         # Basic structure checks
         checks['has_minimum_rows'] = len(df) >= 500
-        checks['has_required_columns'] = all(col in df.columns for col in [
-            'player_id', 'web_name', 'team_id', 'element_type', 'now_cost', 'total_points'
-        ])
+        checks['has_required_columns'] = PLAYERS_REQUIRED.issubset(df.columns)
         
         # Data quality checks
-        checks['no_missing_ids'] = df['player_id'].notna().all()
-        checks['valid_positions'] = df['element_type'].isin([1, 2, 3, 4]).all()
-        checks['valid_prices'] = (df['now_cost'] > 0).all()
-        checks['no_negative_points'] = (df['total_points'] >= 0).all()
+        checks['no_missing_ids'] = not df['player_id'].hasnans
+        checks['valid_positions'] = bool(np.isin(df['element_type'].to_numpy(), (1, 2, 3, 4)).all())
+        checks['valid_prices'] = bool((df['now_cost'].to_numpy() > 0).all())
+        checks['no_negative_points'] = all_between(df['total_points'].to_numpy(), 0, np.inf)
         
         return checks
         
@@ -43,15 +60,13 @@ class FPLDataValidator:
         
         # Basic structure checks
         checks['has_minimum_rows'] = len(df) >= 380  # 20 teams * 38 GWs / 2
-        checks['has_required_columns'] = all(col in df.columns for col in [
-            'fixture_id', 'gameweek', 'team_h', 'team_a', 'team_h_difficulty', 'team_a_difficulty'
-        ])
+        checks['has_required_columns'] = FIXTURES_REQUIRED.issubset(df.columns)
         
         # Data quality checks  
-        checks['no_missing_fixture_ids'] = df['fixture_id'].notna().all()
-        checks['valid_gameweeks'] = df['gameweek'].between(1, 38).all()
-        checks['valid_difficulties'] = df['team_h_difficulty'].between(1, 5).all() and df['team_a_difficulty'].between(1, 5).all()
-        checks['different_teams'] = (df['team_h'] != df['team_a']).all()
+        checks['no_missing_fixture_ids'] = not df['fixture_id'].hasnans
+        checks['valid_gameweeks'] = all_between(df['gameweek'].to_numpy(), 1, 38)
+        checks['valid_difficulties'] = all_between(df['team_h_difficulty'].to_numpy(), 1, 5) and all_between(df['team_a_difficulty'].to_numpy(), 1, 5)
+        checks['different_teams'] = bool((df['team_h'].to_numpy() != df['team_a'].to_numpy()).all())
         
         return checks
         
@@ -66,56 +81,45 @@ class FPLDataValidator:
             
         # Basic structure checks
         checks['has_minimum_rows'] = len(df) >= 10000  # Players * gameweeks
-        checks['has_required_columns'] = all(col in df.columns for col in [
-            'player_id', 'gameweek', 'minutes', 'total_points'
-        ])
+        checks['has_required_columns'] = RESULTS_REQUIRED.issubset(df.columns)
         
         # Data quality checks
-        checks['no_missing_ids'] = df['player_id'].notna().all()
-        checks['valid_gameweeks'] = df['gameweek'].between(1, 38).all()
-        checks['valid_minutes'] = (df['minutes'] >= 0).all() and (df['minutes'] <= 90).all()
-        checks['no_negative_points'] = (df['total_points'] >= 0).all()
+        checks['no_missing_ids'] = not df['player_id'].hasnans
+        checks['valid_gameweeks'] = all_between(df['gameweek'].to_numpy(), 1, 38)
+        checks['valid_minutes'] = all_between(df['minutes'].to_numpy(), 0, 90)
+        checks['no_negative_points'] = all_between(df['total_points'].to_numpy(), 0, np.inf)
         checks['non_empty'] = True
         
         return checks
         
-    def validate_all_data(self) -> Dict[str, Dict[str, bool]]:
-        """Validate all datasets and return comprehensive report."""
+    def validate_all_data(self, fail_fast: bool = False) -> Dict[str, Dict[str, bool]]:
+        """Validate all datasets and return comprehensive report.
+        
+        With fail_fast, stop after the first dataset that fails a check.
+        """
         print("🔍 Validating collected data...")
         
         results = {}
+        datasets = [
+            ('players', "players.csv", PLAYERS_REQUIRED, self.validate_players_data),
+            ('fixtures', "fixtures.csv", FIXTURES_REQUIRED, self.validate_fixtures_data),
+            ('results', "results.csv", RESULTS_REQUIRED, self.validate_results_data),
+        ]
         
         # Load and validate each dataset
         try:
-            # Players data
-            players_file = self.data_dir / "players.csv"
-            if players_file.exists():
-                players_df = pd.read_csv(players_file)
-                results['players'] = self.validate_players_data(players_df)
-                print(f"  Players data: {len(players_df)} rows")
-            else:
-                print("  ❌ Players file not found")
-                results['players'] = {'file_exists': False}
-                
-            # Fixtures data
-            fixtures_file = self.data_dir / "fixtures.csv" 
-            if fixtures_file.exists():
-                fixtures_df = pd.read_csv(fixtures_file)
-                results['fixtures'] = self.validate_fixtures_data(fixtures_df)
-                print(f"  Fixtures data: {len(fixtures_df)} rows")
-            else:
-                print("  ❌ Fixtures file not found")
-                results['fixtures'] = {'file_exists': False}
-                
-            # Results data
-            results_file = self.data_dir / "results.csv"
-            if results_file.exists():
-                results_df = pd.read_csv(results_file)
-                results['results'] = self.validate_results_data(results_df)
-                print(f"  Results data: {len(results_df)} rows")
-            else:
-                print("  ❌ Results file not found")
-                results['results'] = {'file_exists': False}
+            for name, filename, columns, validate in datasets:
+                try:
+                    df = self.read_columns(self.data_dir / filename, columns)
+                except FileNotFoundError:
+                    print(f"  ❌ {name.title()} file not found")
+                    results[name] = {'file_exists': False}
+                else:
+                    results[name] = validate(df)
+                    print(f"  {name.title()} data: {len(df)} rows")
+                    
+                if fail_fast and not all(results[name].values()):
+                    break
                 
         except Exception as e:
             print(f"  ❌ Validation error: {e}")
@@ -157,27 +161,29 @@ class FPLDataValidator:
         if not all_passed:
             print("\n⚠️  Please check the data collection process and resolve issues before proceeding.")
             
-    def run_validation(self) -> bool:
+    def run_validation(self, fail_fast: bool = False) -> bool:
         """Run complete validation and return success status."""
-        results = self.validate_all_data()
+        results = self.validate_all_data(fail_fast=fail_fast)
         self.print_validation_report(results)
         
         # Check if all validations passed
         if 'error' in results:
             return False
             
-        for dataset_checks in results.values():
-            for passed in dataset_checks.values():
-                if not passed:
-                    return False
-                    
-        return True
+        return all(all(checks.values()) for checks in results.values())
 
 
 def main():
     """Main entry point for data validation."""
+    parser = argparse.ArgumentParser(description="Validate raw FPL data in data/raw/")
+    parser.add_argument(
+        '--fail-fast', action='store_true',
+        help="Stop at the first dataset that fails a check instead of reading them all"
+    )
+    args = parser.parse_args()
+    
     validator = FPLDataValidator()
-    success = validator.run_validation()
+    success = validator.run_validation(fail_fast=args.fail_fast)
     
     if success:
         print("✅ Data validation completed successfully!")
@@ -19,11 +19,89 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .schema import (FIXTURES_DTYPES, FIXTURES_FEATURE_COLUMNS, PLAYERS_DTYPES,
+                         PLAYERS_FEATURE_COLUMNS, RESULTS_DTYPES,
+                         RESULTS_FEATURE_COLUMNS)
+except ImportError:  # Run as a script from src/
+    from schema import (FIXTURES_DTYPES, FIXTURES_FEATURE_COLUMNS, PLAYERS_DTYPES,
+                        PLAYERS_FEATURE_COLUMNS, RESULTS_DTYPES,
+                        RESULTS_FEATURE_COLUMNS)
+
+
+def grouped_rolling_sums(values, group_keys, window):
+    """
+    Trailing-window sums and counts per group, for rows already sorted by group.
+    
+    Matches groupby(...).rolling(window, min_periods=1) on contiguous groups by
+    differencing a single cumulative sum rather than rolling each group separately.
+    """
+    n = len(values)
+    positions = np.arange(n)
+    
+    # First row index of the group each row belongs to
+    is_group_start = np.ones(n, dtype=bool)
+    is_group_start[1:] = group_keys[1:] != group_keys[:-1]
+    group_start = np.maximum.accumulate(np.where(is_group_start, positions, 0))
+    
+    # Window covers the last `window` rows, clipped at the group start
+    window_start = np.maximum(positions + 1 - window, group_start)
+    prefix = np.zeros((n + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=prefix[1:])
+    
+    sums = prefix[1:] - prefix[window_start]
+    counts = positions + 1 - window_start
+    return sums, counts
+
+
+def grouped_rolling_mean(values, group_keys, window):
+    """Per-group rolling mean of a 2D array (rows sorted by group)."""
+    sums, counts = grouped_rolling_sums(values, group_keys, window)
+    return sums / counts[:, None]
+
+
+def grouped_rolling_std(values, group_keys, window):
+    """Per-group rolling sample std of a 2D array; NaN where a window has one row."""
+    # One pass over values and their squares side by side
+    n_cols = values.shape[1]
+    stacked_sums, counts = grouped_rolling_sums(
+        np.hstack([values, values ** 2]), group_keys, window
+    )
+    sums, square_sums = stacked_sums[:, :n_cols], stacked_sums[:, n_cols:]
+    counts = counts[:, None]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (square_sums - sums ** 2 / counts) / (counts - 1)
+    return np.sqrt(np.clip(variance, 0, None))
+
+
+def downcast_columns(df, dtypes):
+    """Cast columns to compact dtypes in place, skipping absent or incomplete columns"""
+    for col, dtype in dtypes.items():
+        if col in df.columns and not df[col].hasnans:
+            df[col] = df[col].astype(dtype)
+
+
 class FPLFeatureEngineer:
     """
     Handles feature engineering for FPL optimization model.
     """
     
+    # Raw columns the pipeline uses; the rest of each CSV is skipped at parse time
+    RAW_COLUMNS = {
+        'players': PLAYERS_FEATURE_COLUMNS,
+        'fixtures': FIXTURES_FEATURE_COLUMNS,
+        'results': RESULTS_FEATURE_COLUMNS,
+    }
+    
+    # Compact dtypes applied once the raw data is clean: the collector's schema,
+    # plus position, which only exists as text once read back from CSV
+    CLEAN_DTYPES = {
+        'players': {**PLAYERS_DTYPES, 'position': 'category'},
+        'fixtures': FIXTURES_DTYPES,
+        'results': RESULTS_DTYPES,
+    }
+    
     def __init__(self):
         self.data_dir = Path("data")
         self.raw_dir = self.data_dir / "raw"
@@ -33,14 +111,21 @@ class FPLFeatureEngineer:
         # Rolling windows for feature engineering
         self.rolling_windows = [3, 5]
         
+    def read_raw_csv(self, name):
+        """Read data/raw/{name}.csv, parsing only the columns the pipeline uses"""
+        columns = self.RAW_COLUMNS[name]
+        return pd.read_csv(
+            self.raw_dir / f"{name}.csv", usecols=lambda col: col in columns
+        )
+    
     def load_raw_data(self):
         """Load raw CSV files from data/raw/"""
         print("📂 Loading raw data files...")
         
         try:
-            self.players_df = pd.read_csv(self.raw_dir / "players.csv")
-            self.fixtures_df = pd.read_csv(self.raw_dir / "fixtures.csv")
-            self.results_df = pd.read_csv(self.raw_dir / "results.csv")
+            self.players_df = self.read_raw_csv("players")
+            self.fixtures_df = self.read_raw_csv("fixtures")
+            self.results_df = self.read_raw_csv("results")
             
             print(f"  ✅ Players: {len(self.players_df)} rows")
             print(f"  ✅ Fixtures: {len(self.fixtures_df)} rows")
@@ -57,8 +142,6 @@ class FPLFeatureEngineer:
         print("🧹 Cleaning and normalizing data...")
         
         # Clean players data
-        self.players_df = self.players_df.copy()
-        
         # Standardize player and team IDs
         if 'id' in self.players_df.columns:
             self.players_df['player_id'] = self.players_df['id']
@@ -69,12 +152,15 @@ class FPLFeatureEngineer:
         
         # Ensure position mapping exists
         if 'element_type' in self.players_df.columns:
-            position_map = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'FWD'}
-            self.players_df['position'] = self.players_df['element_type'].map(position_map)
+            # element_type 1-4 indexes the categories directly; anything else is missing
+            element_type = self.players_df['element_type'].to_numpy()
+            valid = (element_type >= 1) & (element_type <= 4)
+            codes = np.where(valid, element_type - 1, -1)
+            self.players_df['position'] = pd.Categorical.from_codes(
+                codes.astype(np.int8), categories=['GK', 'DEF', 'MID', 'FWD']
+            )
         
         # Clean results data
-        self.results_df = self.results_df.copy()
-        
         # Replace missing minutes/points with 0
         numeric_cols = ['minutes', 'total_points', 'goals_scored', 'assists', 
                        'clean_sheets', 'goals_conceded', 'saves', 'bonus', 'bps']
@@ -88,8 +174,6 @@ class FPLFeatureEngineer:
             self.results_df['total_points'] = self.results_df['total_points'].clip(lower=0)
         
         # Clean fixtures data
-        self.fixtures_df = self.fixtures_df.copy()
-        
         # Ensure gameweek and difficulty columns are numeric
         if 'event' in self.fixtures_df.columns:
             self.fixtures_df['gameweek'] = pd.to_numeric(self.fixtures_df['event'], errors='coerce')
@@ -98,6 +182,14 @@ class FPLFeatureEngineer:
             if col in self.fixtures_df.columns:
                 self.fixtures_df[col] = pd.to_numeric(self.fixtures_df[col], errors='coerce').fillna(3)
         
+        # Downcast to compact dtypes so later merges and rolling passes move less memory
+        downcast_columns(self.players_df, self.CLEAN_DTYPES['players'])
+        downcast_columns(self.fixtures_df, self.CLEAN_DTYPES['fixtures'])
+        downcast_columns(self.results_df, self.CLEAN_DTYPES['results'])
+        
+        # Players keyed by ID once, so every later player lookup reuses one hash index
+        self.players_by_id = self.players_df.set_index('player_id')
+        
         print("  ✅ Data cleaning complete")
     
     def create_rolling_features(self):
@@ -111,18 +203,16 @@ class FPLFeatureEngineer:
         performance_metrics = ['total_points', 'minutes', 'goals_scored', 'assists', 
                               'clean_sheets', 'bonus', 'bps']
         
-        # Create rolling features for each window size
+        available = self.results_df.columns
+        metrics = [metric for metric in performance_metrics if metric in available]
+        values = self.results_df[metrics].to_numpy(dtype=np.float64)
+        player_ids = self.results_df['player_id'].to_numpy()
+        
+        # Create rolling means for all metrics at once for each window size
         for window in self.rolling_windows:
-            for metric in performance_metrics:
-                if metric in self.results_df.columns:
-                    # Create rolling mean
-                    col_name = f'{metric}_rolling_{window}'
-                    self.results_df[col_name] = (
-                        self.results_df.groupby('player_id')[metric]
-                        .rolling(window=window, min_periods=1)
-                        .mean()
-                        .reset_index(level=0, drop=True)
-                    )
+            col_names = [f'{metric}_rolling_{window}' for metric in metrics]
+            rolling_means = grouped_rolling_mean(values, player_ids, window)
+            self.results_df[col_names] = rolling_means.astype(np.float32)
         
         print(f"  ✅ Created rolling features for windows: {self.rolling_windows}")
     
@@ -131,41 +221,44 @@ class FPLFeatureEngineer:
         print("⚡ Engineering fixture difficulty features...")
         
         # Merge with fixtures to get difficulty ratings
-        # For home games
-        home_fixtures = self.fixtures_df[['gameweek', 'team_h', 'team_h_difficulty']].copy()
-        home_fixtures.columns = ['gameweek', 'team_id', 'difficulty']
-        home_fixtures['is_home'] = 1
-        
-        # For away games  
-        away_fixtures = self.fixtures_df[['gameweek', 'team_a', 'team_a_difficulty']].copy()
-        away_fixtures.columns = ['gameweek', 'team_id', 'difficulty']
-        away_fixtures['is_home'] = 0
-        
-        # Combine all fixtures
-        all_fixtures = pd.concat([home_fixtures, away_fixtures], ignore_index=True)
+        # Long format: one row per team per fixture, home rows first then away
+        n_fixtures = len(self.fixtures_df)
+        fixtures = self.fixtures_df
+        all_fixtures = pd.DataFrame({
+            'gameweek': np.tile(fixtures['gameweek'].to_numpy(), 2),
+            'team_id': np.concatenate([fixtures['team_h'].to_numpy(),
+                                       fixtures['team_a'].to_numpy()]),
+            'difficulty': np.concatenate([fixtures['team_h_difficulty'].to_numpy(),
+                                          fixtures['team_a_difficulty'].to_numpy()]),
+            'is_home': np.repeat(np.array([1, 0], dtype=np.int8), n_fixtures),
+        }).set_index(['gameweek', 'team_id'])
         
         # Merge results with player team info
-        player_teams = self.players_df[['player_id', 'team_id']].copy()
-        results_with_teams = self.results_df.merge(player_teams, on='player_id', how='left')
-        
-        # Merge with fixture difficulty
-        self.results_df = results_with_teams.merge(
-            all_fixtures, 
-            left_on=['gameweek', 'team_id'], 
-            right_on=['gameweek', 'team_id'], 
-            how='left'
+        results_with_teams = self.results_df.join(
+            self.players_by_id[['team_id']], on='player_id'
         )
         
+        # Merge with fixture difficulty (a team can have several fixtures in a gameweek)
+        self.results_df = results_with_teams.join(
+            all_fixtures, on=['gameweek', 'team_id']
+        ).reset_index(drop=True)
+        
         # Fill missing difficulty with average (3)
-        self.results_df['difficulty'] = self.results_df['difficulty'].fillna(3)
-        self.results_df['is_home'] = self.results_df['is_home'].fillna(0)
+        difficulty = self.results_df['difficulty'].fillna(3)
+        self.results_df['difficulty'] = difficulty.astype(np.int8)
+        is_home = self.results_df['is_home'].fillna(0)
+        self.results_df['is_home'] = is_home.astype(np.int8)
         
         # Create difficulty-adjusted expected points
         # Easier fixtures (lower difficulty) should boost expected performance
-        difficulty_multiplier = 6 - self.results_df['difficulty']  # 5=easiest, 1=hardest
-        self.results_df['difficulty_adjusted_points'] = (
-            self.results_df['total_points'] * difficulty_multiplier / 3
+        # Computed in place in one float32 buffer: total_points * (6 - difficulty) / 3
+        # 6 - difficulty runs from 5 (easiest) to 1 (hardest)
+        adjusted_points = np.subtract(
+            6, self.results_df['difficulty'].to_numpy(), dtype=np.float32
         )
+        adjusted_points *= self.results_df['total_points'].to_numpy()
+        adjusted_points /= 3
+        self.results_df['difficulty_adjusted_points'] = adjusted_points
         
         print("  ✅ Fixture difficulty features created")
     
@@ -174,34 +267,39 @@ class FPLFeatureEngineer:
         print("⏱️ Engineering minutes likelihood features...")
         
         # Calculate recent minutes trends
-        self.results_df['minutes_played'] = (self.results_df['minutes'] > 0).astype(int)
+        played = self.results_df['minutes'].to_numpy() > 0
+        self.results_df['minutes_played'] = played.astype(np.int8)
         
         # Rolling probability of getting minutes
+        minutes_played = self.results_df[['minutes_played']].to_numpy(dtype=np.float64)
+        player_ids = self.results_df['player_id'].to_numpy()
         for window in self.rolling_windows:
             col_name = f'minutes_likelihood_{window}'
-            self.results_df[col_name] = (
-                self.results_df.groupby('player_id')['minutes_played']
-                .rolling(window=window, min_periods=1)
-                .mean()
-                .reset_index(level=0, drop=True)
-            )
+            likelihood = grouped_rolling_mean(minutes_played, player_ids, window)[:, 0]
+            self.results_df[col_name] = likelihood.astype(np.float32)
+        
+        # Average minutes when played: rolling mean over appearances only, carried
+        # forward through a player's blank gameweeks
+        played_minutes = self.results_df[['minutes']].to_numpy(dtype=np.float64)[played]
+        played_ids = player_ids[played]
+        
+        # Rows before a player's first appearance fall back to the average
+        # (or a full game)
+        fallback = self.results_df['minutes'].mean() if played.any() else 90
         
-        # Average minutes when played
         for window in self.rolling_windows:
             col_name = f'avg_minutes_when_played_{window}'
-            # Only calculate for games where player got minutes
-            minutes_when_played = self.results_df[self.results_df['minutes'] > 0]
-            if not minutes_when_played.empty:
-                avg_minutes = (
-                    minutes_when_played.groupby('player_id')['minutes']
-                    .rolling(window=window, min_periods=1)
-                    .mean()
-                )
-                self.results_df[col_name] = self.results_df['player_id'].map(
-                    avg_minutes.groupby('player_id').tail(1)
-                ).fillna(self.results_df['minutes'].mean())
-            else:
-                self.results_df[col_name] = 90  # Default full game
+            avg_minutes = np.full(len(played), np.nan)
+            avg_minutes[played] = grouped_rolling_mean(
+                played_minutes, played_ids, window
+            )[:, 0]
+            self.results_df[col_name] = (
+                pd.Series(avg_minutes, index=self.results_df.index)
+                .groupby(player_ids)
+                .ffill()
+                .fillna(fallback)
+                .astype(np.float32)
+            )
         
         print("  ✅ Minutes likelihood features created")
     
@@ -210,14 +308,17 @@ class FPLFeatureEngineer:
         print("💰 Adding position and price features...")
         
         # Merge with player information
-        player_info = self.players_df[['player_id', 'position', 'now_cost', 'team_id']].copy()
+        player_info = self.players_by_id[['position', 'now_cost', 'team_id']]
         
         # Convert price from pence to pounds
         if 'now_cost' in player_info.columns:
-            player_info['price'] = player_info['now_cost'] / 10
+            price = (player_info['now_cost'] / 10).astype(np.float32)
+            player_info = player_info.assign(price=price)
         
         # Merge with results
-        self.results_df = self.results_df.merge(player_info, on='player_id', how='left', suffixes=('', '_player'))
+        self.results_df = self.results_df.join(
+            player_info, on='player_id', rsuffix='_player'
+        )
         
         # Use the team_id from player info if not already present
         if 'team_id_player' in self.results_df.columns:
@@ -230,28 +331,27 @@ class FPLFeatureEngineer:
         """Create form-based features"""
         print("📊 Creating form-based features...")
         
-        # Points per minute efficiency
-        self.results_df['points_per_minute'] = np.where(
-            self.results_df['minutes'] > 0,
-            self.results_df['total_points'] / self.results_df['minutes'],
-            0
-        )
+        # Points per minute efficiency (only divide where minutes were played)
+        minutes = self.results_df['minutes'].to_numpy()
+        points_per_minute = np.zeros(len(minutes), dtype=np.float32)
+        np.divide(self.results_df['total_points'].to_numpy(), minutes,
+                  out=points_per_minute, where=minutes > 0)
+        self.results_df['points_per_minute'] = points_per_minute
         
         # Goal involvement (goals + assists)
-        self.results_df['goal_involvement'] = (
-            self.results_df['goals_scored'] + self.results_df['assists']
+        self.results_df['goal_involvement'] = np.add(
+            self.results_df['goals_scored'].to_numpy(),
+            self.results_df['assists'].to_numpy()
         )
         
         # Consistency (standard deviation of recent points)
+        total_points = self.results_df[['total_points']].to_numpy(dtype=np.float64)
+        player_ids = self.results_df['player_id'].to_numpy()
         for window in self.rolling_windows:
             col_name = f'points_consistency_{window}'
-            self.results_df[col_name] = (
-                self.results_df.groupby('player_id')['total_points']
-                .rolling(window=window, min_periods=1)
-                .std()
-                .reset_index(level=0, drop=True)
-                .fillna(0)
-            )
+            consistency = grouped_rolling_std(total_points, player_ids, window)[:, 0]
+            consistency = np.nan_to_num(consistency, nan=0.0)
+            self.results_df[col_name] = consistency.astype(np.float32)
         
         print("  ✅ Form features created")
     
@@ -283,7 +383,7 @@ class FPLFeatureEngineer:
         # Keep only columns that exist in the dataframe
         existing_columns = [col for col in feature_columns if col in self.results_df.columns]
         
-        self.features_df = self.results_df[existing_columns].copy()
+        self.features_df = self.results_df[existing_columns]
         
         # Sort by player and gameweek for consistency
         self.features_df = self.features_df.sort_values(['player_id', 'gameweek'])
@@ -0,0 +1,62 @@
+"""
+FPL Data Schema
+
+Column names and dtypes for the raw datasets in data/raw/, shared by the
+collector (which applies the dtypes), the validator (which checks the
+required columns) and feature engineering (which reads a subset of columns
+back with the same dtypes).
+"""
+
+# Decimal stats the API sends as strings
+PLAYER_DECIMAL_COLUMNS = [
+    'influence', 'creativity', 'threat', 'ict_index', 'selected_by_percent',
+    'form', 'points_per_game', 'ep_next', 'ep_this', 'value_form', 'value_season'
+]
+
+# Compact dtypes for non-nullable columns
+PLAYERS_DTYPES = {
+    'player_id': 'int32', 'team_id': 'int8', 'element_type': 'int8',
+    'now_cost': 'int16', 'total_points': 'int16', 'minutes': 'int16',
+    'goals_scored': 'int16', 'assists': 'int16', 'clean_sheets': 'int16',
+    'goals_conceded': 'int16', 'own_goals': 'int16', 'penalties_saved': 'int16',
+    'penalties_missed': 'int16', 'yellow_cards': 'int16', 'red_cards': 'int16',
+    'saves': 'int16', 'bonus': 'int16', 'bps': 'int16',
+    'transfers_in': 'int32', 'transfers_out': 'int32',
+    'transfers_in_event': 'int32', 'transfers_out_event': 'int32',
+    **{column: 'float32' for column in PLAYER_DECIMAL_COLUMNS}
+}
+TEAMS_DTYPES = {'team_id': 'int8', 'strength': 'int8'}
+FIXTURES_DTYPES = {
+    'fixture_id': 'int16', 'gameweek': 'int8', 'team_h': 'int8', 'team_a': 'int8',
+    'team_h_difficulty': 'int8', 'team_a_difficulty': 'int8'
+}
+RESULTS_DTYPES = {
+    'player_id': 'int32', 'gameweek': 'int8', 'minutes': 'int16',
+    'goals_scored': 'int8', 'assists': 'int8', 'clean_sheets': 'int8',
+    'goals_conceded': 'int8', 'own_goals': 'int8', 'penalties_saved': 'int8',
+    'penalties_missed': 'int8', 'yellow_cards': 'int8', 'red_cards': 'int8',
+    'saves': 'int8', 'bonus': 'int8', 'bps': 'int16',
+    'influence': 'float32', 'creativity': 'float32', 'threat': 'float32',
+    'ict_index': 'float32', 'total_points': 'int16', 'in_dreamteam': 'bool'
+}
+
+# Columns each dataset must provide
+PLAYERS_REQUIRED = frozenset({
+    'player_id', 'web_name', 'team_id', 'element_type', 'now_cost', 'total_points'
+})
+FIXTURES_REQUIRED = frozenset({
+    'fixture_id', 'gameweek', 'team_h', 'team_a', 'team_h_difficulty', 'team_a_difficulty'
+})
+RESULTS_REQUIRED = frozenset({'player_id', 'gameweek', 'minutes', 'total_points'})
+
+# Raw columns feature engineering reads (alternate API names included)
+PLAYERS_FEATURE_COLUMNS = frozenset({
+    'player_id', 'id', 'team_id', 'team', 'element_type', 'position', 'now_cost'
+})
+FIXTURES_FEATURE_COLUMNS = frozenset({
+    'gameweek', 'event', 'team_h', 'team_a', 'team_h_difficulty', 'team_a_difficulty'
+})
+RESULTS_FEATURE_COLUMNS = frozenset({
+    'player_id', 'gameweek', 'minutes', 'total_points', 'goals_scored', 'assists',
+    'clean_sheets', 'goals_conceded', 'saves', 'bonus', 'bps'
+})
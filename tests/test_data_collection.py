@@ -0,0 +1,157 @@
+"""Tests for FPL data collection against a mocked FPL API."""
+
+import json
+
+import pandas as pd
+import pytest
+import requests
+
+from src.data_collection import FPLDataCollector
+
+GAMEWEEKS = 5
+ETAG = '"v1"'
+
+
+def make_player(player_id):
+    """Bootstrap element record with every collected field set."""
+    player = {field: 0 for field in FPLDataCollector.PLAYER_FIELDS}
+    player.update({
+        'id': player_id, 'web_name': f'P{player_id}', 'team': 1,
+        'element_type': 1, 'now_cost': 45, 'news': '', 'status': 'a'
+    })
+    return player
+
+
+def make_team(team_id):
+    """Bootstrap team record with every collected field set."""
+    team = {field: 1 for field in FPLDataCollector.TEAM_FIELDS}
+    team.update({'id': team_id, 'name': f'Team {team_id}', 'short_name': f'T{team_id}'})
+    return team
+
+
+BOOTSTRAP = {
+    'elements': [make_player(1), make_player(2)],
+    'teams': [make_team(1)],
+    'events': [
+        {'id': gw, 'finished': True, 'data_checked': True}
+        for gw in range(1, GAMEWEEKS + 1)
+    ]
+}
+FIXTURES = [{
+    'id': 1, 'event': 1, 'team_h': 1, 'team_a': 1, 'team_h_difficulty': 2,
+    'team_a_difficulty': 3, 'kickoff_time': '2024-08-16T19:00:00Z'
+}]
+
+
+def make_live(gw):
+    """Live payload for a gameweek with two players."""
+    return {'elements': [
+        {'id': player_id, 'stats': {'minutes': 90, 'total_points': gw}}
+        for player_id in (1, 2)
+    ]}
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, payload, status_code=200, headers=None):
+        self.content = json.dumps(payload).encode() if payload is not None else b''
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Server Error")
+
+
+class FakeAPI:
+    """Serves bootstrap, fixtures and live data, honouring the bootstrap ETag."""
+
+    def __init__(self):
+        self.failing_gameweeks = set()
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        endpoint = url.split('/api/', 1)[1]
+        self.requests.append(endpoint)
+        if endpoint == 'bootstrap-static/':
+            if (headers or {}).get('If-None-Match') == ETAG:
+                return FakeResponse(None, status_code=304)
+            return FakeResponse(BOOTSTRAP, headers={'ETag': ETAG})
+        if endpoint == 'fixtures/':
+            return FakeResponse(FIXTURES)
+        gw = int(endpoint.split('/')[1])
+        if gw in self.failing_gameweeks:
+            return FakeResponse({}, status_code=500)
+        return FakeResponse(make_live(gw) if gw <= GAMEWEEKS else {'elements': []})
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Route collector requests to a FakeAPI and make cached bootstrap data stale."""
+    fake_api = FakeAPI()
+
+    def fake_get(session, url, **kwargs):
+        return fake_api.get(url, **kwargs)
+
+    monkeypatch.setattr(requests.Session, 'get', fake_get)
+    monkeypatch.setattr(FPLDataCollector, 'CACHE_TTL', -1)
+    return fake_api
+
+
+def collected_gameweeks(output_dir):
+    return sorted(pd.read_csv(output_dir / "results.csv")['gameweek'].unique())
+
+
+def test_unchanged_bootstrap_keeps_complete_outputs(api, tmp_path):
+    FPLDataCollector(output_dir=tmp_path).collect_all_data()
+    api.requests.clear()
+
+    FPLDataCollector(output_dir=tmp_path).collect_all_data()
+
+    assert api.requests == ['bootstrap-static/']
+    assert collected_gameweeks(tmp_path) == list(range(1, GAMEWEEKS + 1))
+
+
+def test_failed_gameweek_is_refetched_despite_unchanged_bootstrap(api, tmp_path):
+    api.failing_gameweeks = {4}
+    collector = FPLDataCollector(output_dir=tmp_path)
+    collector.collect_all_data()
+
+    assert collector.failed_gameweeks == {4}
+    assert 4 not in collected_gameweeks(tmp_path)
+
+    api.failing_gameweeks = set()
+    FPLDataCollector(output_dir=tmp_path).collect_all_data()
+
+    assert 'event/4/live/' in api.requests
+    assert collected_gameweeks(tmp_path) == list(range(1, GAMEWEEKS + 1))
+
+
+def test_only_data_checked_gameweeks_are_cached_forever(api, tmp_path, monkeypatch):
+    events = [
+        {'id': gw, 'finished': True, 'data_checked': gw < GAMEWEEKS}
+        for gw in range(1, GAMEWEEKS + 1)
+    ]
+    monkeypatch.setitem(BOOTSTRAP, 'events', events)
+    collector = FPLDataCollector(output_dir=tmp_path)
+    collector.collect_bootstrap_data()
+    collector.collect_gameweek_data(max_gameweeks=GAMEWEEKS)
+    api.requests.clear()
+
+    collector.collect_gameweek_data(max_gameweeks=GAMEWEEKS)
+
+    assert api.requests == [f'event/{GAMEWEEKS}/live/']
+
+
+def test_clear_cache_forces_refetch(api, tmp_path):
+    collector = FPLDataCollector(output_dir=tmp_path)
+    collector.collect_bootstrap_data()
+    collector.collect_gameweek_data(max_gameweeks=GAMEWEEKS)
+    api.requests.clear()
+
+    collector.clear_cache()
+    collector.collect_gameweek_data(max_gameweeks=GAMEWEEKS)
+
+    assert len(api.requests) == GAMEWEEKS
+    assert list(collector.cache_dir.glob('event_*')) != []
@@ -0,0 +1,99 @@
+"""Tests for feature engineering: grouped rolling helpers and minutes features."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering import (FPLFeatureEngineer, grouped_rolling_mean,
+                                     grouped_rolling_std)
+
+
+def make_results():
+    """
+    Results sorted by player and gameweek: player 1 has a single row, player 2
+    fewer rows than any window, and player 3 a double gameweek (two GW3 rows).
+    """
+    rows = [
+        (1, 1, 6, 90),
+        (2, 1, 2, 45), (2, 2, 0, 0),
+        (3, 1, 8, 90), (3, 2, 1, 20), (3, 3, 5, 90), (3, 3, 12, 90),
+        (3, 4, 3, 60), (3, 5, 0, 0), (3, 6, 9, 90),
+    ]
+    columns = ['player_id', 'gameweek', 'total_points', 'minutes']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def pandas_rolling(results, window, stat):
+    grouped = results.groupby('player_id')[['total_points', 'minutes']]
+    rolling = grouped.rolling(window, min_periods=1)
+    return getattr(rolling, stat)().reset_index(level=0, drop=True).to_numpy()
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 5, 10])
+def test_grouped_rolling_mean_matches_pandas(window):
+    results = make_results()
+    values = results[['total_points', 'minutes']].to_numpy(dtype=np.float64)
+
+    actual = grouped_rolling_mean(values, results['player_id'].to_numpy(), window)
+
+    np.testing.assert_allclose(actual, pandas_rolling(results, window, 'mean'))
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 5, 10])
+def test_grouped_rolling_std_matches_pandas(window):
+    results = make_results()
+    values = results[['total_points', 'minutes']].to_numpy(dtype=np.float64)
+
+    actual = grouped_rolling_std(values, results['player_id'].to_numpy(), window)
+
+    expected = pandas_rolling(results, window, 'std')
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+
+def test_single_row_group_std_is_nan():
+    results = make_results()
+    values = results[['total_points']].to_numpy(dtype=np.float64)
+
+    actual = grouped_rolling_std(values, results['player_id'].to_numpy(), 3)
+
+    assert np.isnan(actual[0, 0])
+
+
+def reference_avg_minutes_when_played(results, window, fallback):
+    """Per-player loop: mean of the last `window` appearances seen so far."""
+    averages = []
+    for _, player_rows in results.groupby('player_id', sort=False):
+        appearances = []
+        for minutes in player_rows['minutes']:
+            if minutes > 0:
+                appearances.append(minutes)
+            averages.append(np.mean(appearances[-window:]) if appearances else fallback)
+    return np.array(averages)
+
+
+@pytest.fixture
+def engineer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    return FPLFeatureEngineer()
+
+
+def test_avg_minutes_when_played_matches_per_player_reference(engineer):
+    # Player 1 blanks before their first appearance and mid-run, and makes more
+    # appearances than either window; player 2 never plays
+    rows = [
+        (1, 1, 0), (1, 2, 0), (1, 3, 90), (1, 4, 60), (1, 5, 0), (1, 6, 30),
+        (1, 7, 45), (1, 8, 80), (1, 9, 0), (1, 10, 20), (1, 11, 70),
+        (2, 1, 0), (2, 2, 0), (2, 3, 0),
+        (3, 1, 15), (3, 2, 0), (3, 3, 0), (3, 4, 90),
+    ]
+    results = pd.DataFrame(rows, columns=['player_id', 'gameweek', 'minutes'])
+    engineer.results_df = results.copy()
+
+    engineer.create_minutes_likelihood_features()
+
+    fallback = results['minutes'].mean()
+    for window in engineer.rolling_windows:
+        expected = reference_avg_minutes_when_played(results, window, fallback)
+        actual = engineer.results_df[f'avg_minutes_when_played_{window}']
+        np.testing.assert_allclose(actual, expected, rtol=1e-6)